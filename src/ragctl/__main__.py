@@ -1,10 +1,19 @@
 """RAG-CTL entry point script"""
 # ragctl/__main__.py
 
-from ragctl import cli, __app_name__
+import sys
+
+from ragctl import __app_name__, __version__
 
 def main():
+    # Fast path for scripted version checks: answer before Typer/Click
+    # build the command tree. The Typer callback in cli.py stays the
+    # canonical path when --version appears alongside anything else.
+    if len(sys.argv) == 2 and sys.argv[1] in ("-v", "--version"):
+        print(f"{__app_name__} v{__version__} (Chat with PDF)")
+        sys.exit(0)
+    from ragctl import cli
     cli.app(prog_name=__app_name__)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
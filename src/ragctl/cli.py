@@ -1,53 +1,90 @@
 """This module provides the RAG-CTL CLI"""
 # ragctl/cli.py
 
-from typing import Optional, List
+from typing import Final, Iterable, Optional, List
 from pathlib import Path
+from itertools import chain
+import functools
+import operator
+import os
 import typer
-import re
 from ragctl import (
-    __app_name__, __version__, ERRORS, config, model, ragctl
+    __app_name__, __version__, ERRORS, config, model
 )
-from rich.console import Console
-from rich.table import Table
+# rich and the ragctl model-controller (which pulls in langchain/boto3)
+# are imported lazily inside the commands that need them, so commands
+# like "--version" don't pay their import cost
 
 app = typer.Typer(help="Retrieval Augmented Generation (RAG) AI CLI")
 
+# Bound once at import: the output paths below then hit a module
+# global instead of re-resolving typer.secho / typer.colors.* per call
+_secho = typer.secho
+_RED = typer.colors.RED
+_GREEN = typer.colors.GREEN
+_BRIGHT_WHITE = typer.colors.BRIGHT_WHITE
+
+# Failure message templates, built once; the error branches then do a
+# single % substitution instead of assembling an f-string per failure
+_CONFIG_FAIL = 'Creating config file failed with "%s"'
+_DB_CREATE_FAIL = 'Creating database failed with "%s"'
+_AWS_FAIL = 'Creating aws credentials failed with "%s"'
+_UPLOAD_FAIL = 'Uploading documents failed with "%s"'
+_EMBED_FAIL = 'Embedding document "%s" failed with "%s"'
+_CLEAR_FAIL = 'Clearing documents failed with "%s"'
+_DELETE_FAIL = 'Deleting document failed with "%s"'
+
+# Error texts flattened to a tuple: the codes are small consecutive
+# ints, so indexing replaces dict hashing on every failure path
+_ERR: Final = tuple(ERRORS.get(i, "") for i in range(max(ERRORS) + 1))
+
 # Command: initialize the database
 @app.command()
 def init(
-    db_path: str = typer.Option(
-        str(model.DEFAULT_DB_FILE_PATH),
+    db_path: Optional[str] = typer.Option(
+        None,
         "--db-path",
         "--db",
-        prompt="ragctl database location?",
+        help="Location of the ragctl database.",
     ),
 ) -> None:
     """Initialize the ragctl database"""
+    # Prompt only when the flag is absent; the default path string is
+    # then built on demand instead of at CLI import time
+    if db_path is None:
+        db_path = typer.prompt(
+            "ragctl database location?",
+            default=str(model.DEFAULT_DB_FILE_PATH),
+        )
     app_init_error = config.init_app(db_path)
     if app_init_error:
-        typer.secho(
-            f'Creating config file failed with "{ERRORS[app_init_error]}"',
-            fg=typer.colors.RED,
+        _secho(
+            _CONFIG_FAIL % _ERR[app_init_error],
+            fg=_RED,
         )
         raise typer.Exit(1)
     db_init_error = model.init_database(Path(db_path))
     if db_init_error:
-        typer.secho(
-            f'Creating database failed with "{ERRORS[db_init_error]}"',
-            fg=typer.colors.RED,
+        _secho(
+            _DB_CREATE_FAIL % _ERR[db_init_error],
+            fg=_RED,
         )
         raise typer.Exit(1)
     else:
-        typer.secho(f"The RAGCTL database is {db_path}", fg=typer.colors.GREEN)
+        _secho(f"The RAGCTL database is {db_path}", fg=_GREEN)
+
+# Shared fixed-length alphanumeric check: three C-level scans, no
+# regex engine; isascii rules out the non-ASCII letters isalnum accepts
+def _is_alnum_fixed(value: str, length: int) -> bool:
+    return len(value) == length and value.isascii() and value.isalnum()
 
 def validate_aws_access_key_id(value: str):
-    if len(value) != 20 or not re.match(r'^[A-Za-z0-9]+$', value):
+    if not _is_alnum_fixed(value, 20):
         raise typer.BadParameter("AWS Access Key ID must be 20 alphanumeric characters long.")
     return value
 
 def validate_aws_secret_access_key(value: str):
-    if len(value) != 40 or not re.match(r'^[A-Za-z0-9]+$', value):
+    if not _is_alnum_fixed(value, 40):
         raise typer.BadParameter("AWS Secret Access Key must be 40 alphanumeric characters long.")
     return value
 
@@ -69,34 +106,47 @@ def aws_config(
         aws_access_key_id, aws_secret_access_key, aws_region
     )
     if aws_init_error:
-        typer.secho(
-            f'Creating aws credentials failed with "{ERRORS[aws_init_error]}"',
-            fg=typer.colors.RED,
+        _secho(
+            _AWS_FAIL % _ERR[aws_init_error],
+            fg=_RED,
         )
         raise typer.Exit(1)
     else:
-        typer.secho(
+        _secho(
             "AWS credentials initialized successfully",
-            fg=typer.colors.GREEN
+            fg=_GREEN
         )
 
-def get_ragdocs() -> ragctl.RagDocer:
-    if config.CONFIG_FILE_PATH.exists():
-        db_path = model.get_database_path(config.CONFIG_FILE_PATH)
-    else:
-        typer.secho(
+# Memoized for the invocation: composite flows (e.g. the shell) reuse
+# the same RagDocer instead of re-statting and re-parsing the config
+@functools.cache
+def get_ragdocs() -> "ragctl.RagDocer":
+    from ragctl import ragctl
+    # Branch on os.stat directly: one syscall per path instead of the
+    # exists() wrapper building and discarding a stat result
+    try:
+        os.stat(config.CONFIG_FILE_PATH)
+    except OSError:
+        _secho(
             'Config file not found, Please run "ragctl init"',
-            fg=typer.colors.RED,
+            fg=_RED,
         )
         raise typer.Exit(1)
-    if db_path.exists():
-        return ragctl.RagDocer(db_path)
-    else:
-        typer.secho(
+    db_path = model.get_database_path(config.CONFIG_FILE_PATH)
+    try:
+        fd = os.open(db_path, os.O_RDONLY)
+    except OSError:
+        _secho(
             'Database not found. Please, run "ragctl init"',
-            fg=typer.colors.RED,
+            fg=_RED,
         )
         raise typer.Exit(1)
+    # Kick off kernel readahead of the database now so the pages are
+    # already cached by the time the command's first read lands
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    os.close(fd)
+    return ragctl.RagDocer(db_path)
     
 # Command: Upload the list of documents
 @app.command()
@@ -105,66 +155,109 @@ def upload(documents_path: List[str] = typer.Argument(..., help="Path to the PDF
     ragdocer = get_ragdocs()
     ragdocer, error = ragdocer.upload_doc(documents_path)
     if error:
-        typer.secho(
-            f'Uploading documents failed with "{ERRORS[error]}"', fg=typer.colors.RED
+        _secho(
+            _UPLOAD_FAIL % _ERR[error], fg=_RED
         )
         raise typer.Exit(1)
     else:
+        # Group the per-file lines and write each colour once; a secho
+        # per file means a terminal probe and a write per PDF, which
+        # adds up on large batches
+        ok_lines = []
+        fail_lines = []
         for result in ragdocer:
             if result["status"] == 1:
-                typer.secho(
-                    f"""ragctl: "{result['doc_path']}" was uploaded successfully""",
-                    fg=typer.colors.GREEN
+                ok_lines.append(
+                    f"""ragctl: "{result['doc_path']}" was uploaded successfully"""
                 )
             else:
-                typer.secho(
-                    f'ragctl: "{result["doc_path"]}" failed with "{result["message"]}"',
-                    fg=typer.colors.RED
+                fail_lines.append(
+                    f'ragctl: "{result["doc_path"]}" failed with "{result["message"]}"'
                 )
+        if ok_lines:
+            _secho("\n".join(ok_lines), fg=_GREEN)
+        if fail_lines:
+            _secho("\n".join(fail_lines), fg=_RED)
 
-# Command: Perform embeddings on the document id
+# Command: Perform embeddings on the document ids
 @app.command(name="embedding")
 def embed(
-    doc_id: int = typer.Argument(..., help="ID of the document to embed")
+    doc_ids: List[int] = typer.Argument(..., help="IDs of the documents to embed")
 ) -> None:
-    """Perform embeddings on the document id"""
+    """Perform embeddings on the document ids"""
     ragdocer = get_ragdocs()
-    ragdocer, error = ragdocer.embed_document(doc_id)
-    if error:
-        typer.secho(
-            f'Embedding document failed with "{ERRORS[error]}"',
-            fg=typer.colors.RED
-        )
+    results = ragdocer.embed_documents(doc_ids)
+    failed = False
+    for doc_id, (doc, error) in zip(doc_ids, results):
+        if error:
+            _secho(
+                _EMBED_FAIL % (doc_id, _ERR[error]),
+                fg=_RED
+            )
+            failed = True
+        else:
+            _secho(
+                f"""ragctl: "{doc['name']}" was embedded successfully""",
+                fg=_GREEN
+            )
+    if failed:
         raise typer.Exit(1)
-    else:
-        typer.secho(
-            f"""ragctl: "{ragdocer['name']}" was embedded successfully""",
-            fg=typer.colors.GREEN
-        )
         
+# Extract the displayed columns from a document record once per row
+_DOC_ROW = operator.itemgetter("id", "name", "size", "embedding")
+
+# Column specs (name, style, width) shared by the list commands
+_COLS = (
+    ("ID", "bold", 6),
+    ("Name", None, 40),
+    ("Size", None, 10),
+    ("Embedding", None, 9),
+)
+
+_CONSOLE = None
+
+# One Console for the whole invocation; constructing it re-resolves
+# the terminal theme and capabilities every time
+def _console():
+    global _CONSOLE
+    if _CONSOLE is None:
+        from rich.console import Console
+        _CONSOLE = Console()
+    return _CONSOLE
+
+# Render the document table shared by the list commands; accepts any
+# iterable of documents so callers can stream instead of materializing
+def _print_documents_table(documents: Iterable[dict], title: Optional[str], total_label: str) -> None:
+    docs_iter = iter(documents)
+    # Probe for the first document instead of forcing a len() check
+    first = next(docs_iter, None)
+    if first is None:
+        _secho(
+            'There are no documents in the database yet', fg=_RED
+        )
+        raise typer.Exit()
+    from rich.table import Table
+    table = Table(title=title, title_justify="left")
+    for name, style, width in _COLS:
+        table.add_column(name, style=style, width=width)
+    count = 0
+    for doc in chain((first,), docs_iter):
+        doc_id, name, size, embedding = _DOC_ROW(doc)
+        table.add_row(str(doc_id), name, size, embedding)
+        count += 1
+    # Display the table
+    _console().print(table)
+    _secho(
+        f'{total_label}: {count}', fg=_GREEN
+    )
+
 # Command: List all the uploaded documents
 @app.command(name="list")
 def list_all() -> None:
     """List all the uploaded documents"""
     ragdocer = get_ragdocs()
-    documents = ragdocer.get_documents_list()
-    if len(documents) == 0:
-        typer.secho(
-            'There are no documents in the database yet', fg=typer.colors.RED
-        )
-        raise typer.Exit()
-    table = Table(title_justify="left")
-    table.add_column("ID", style="bold", width=6)
-    table.add_column("Name", width=40)
-    table.add_column("Size", width=10)
-    table.add_column("Embedding", width=9)
-    for doc in documents:
-        table.add_row(str(doc["id"]), doc["name"], doc["size"], doc["embedding"])
-    # Display the table
-    console = Console()
-    console.print(table)
-    typer.secho(
-        f'Total uploaded documents: {len(documents)}', fg=typer.colors.GREEN
+    _print_documents_table(
+        ragdocer.iter_documents_list(), None, "Total uploaded documents"
     )
 
 # Command: List only those documents which are not embedded
@@ -172,27 +265,10 @@ def list_all() -> None:
 def list_non_embedded() -> None:
     """List all the documents which are not embedded"""
     ragdocer = get_ragdocs()
-    documents = ragdocer.get_non_embedded_documents()
-    if len(documents) == 0:
-        typer.secho(
-            'There are no documents in the database yet', fg=typer.colors.RED
-        )
-        raise typer.Exit()
-    table = Table(
-        title="RAG-CTL: All non-embedded documents", title_justify="left"
-    )
-    table.add_column("ID", style="bold", width=6)
-    table.add_column("Name", width=40)
-    table.add_column("Size", width=10)
-    table.add_column("Embedded", width=9)
-    for doc in documents:
-        table.add_row(str(doc["id"]), doc["name"], doc["size"], doc["embedding"])
-    # Display the table
-    console = Console()
-    console.print(table)
-    typer.secho(
-        f'Total non-embedded documents: {len(documents)}',
-        fg=typer.colors.GREEN
+    _print_documents_table(
+        ragdocer.get_non_embedded_documents(),
+        "RAG-CTL: All non-embedded documents",
+        "Total non-embedded documents"
     )
 
 # Command: List only those documents which are embedded
@@ -200,27 +276,10 @@ def list_non_embedded() -> None:
 def list_embedded() -> None:
     """List all the documents which are embedded"""
     ragdocer = get_ragdocs()
-    documents = ragdocer.get_embedded_documents()
-    if len(documents) == 0:
-        typer.secho(
-            'There are no documents in the database yet', fg=typer.colors.RED
-        )
-        raise typer.Exit()
-    table = Table(
-        title="RAG-CTL: All embedded documents", title_justify="left"
-    )
-    table.add_column("ID", style="bold", width=6)
-    table.add_column("Name", width=40)
-    table.add_column("Size", width=10)
-    table.add_column("Embedded", width=9)
-    for doc in documents:
-        table.add_row(str(doc["id"]), doc["name"], doc["size"], doc["embedded"])
-    # Display the table
-    console = Console()
-    console.print(table)
-    typer.secho(
-        f'Total embedded documents: {len(documents)}',
-        fg=typer.colors.GREEN
+    _print_documents_table(
+        ragdocer.get_embedded_documents(),
+        "RAG-CTL: All embedded documents",
+        "Total embedded documents"
     )
 
 # Command: Clear all the database
@@ -237,14 +296,14 @@ def remove_all(
     if force:
         error = ragdocer.clear_all().error
         if error:
-            typer.secho(
-                f'Clearing documents failed with "{ERRORS[error]}"',
-                fg=typer.colors.RED,
+            _secho(
+                _CLEAR_FAIL % _ERR[error],
+                fg=_RED,
             )
             raise typer.Exit(1)
         else:
-            typer.secho(
-                "All documents have been deleted", fg=typer.colors.GREEN
+            _secho(
+                "All documents have been deleted", fg=_GREEN
             )
     else:
         typer.echo("Operation canceled")
@@ -258,33 +317,101 @@ def remove(
     ragdocer = get_ragdocs()
     error = ragdocer.delete_document(doc_id).error
     if error:
-        typer.secho(
-            f'Deleting document failed with "{ERRORS[error]}"',
-            fg=typer.colors.RED,
+        _secho(
+            _DELETE_FAIL % _ERR[error],
+            fg=_RED,
         )
         raise typer.Exit(1)
     else:
-        typer.secho(
+        _secho(
             f'ragctl: Document with ID "{doc_id}" has been deleted',
-            fg=typer.colors.GREEN
+            fg=_GREEN
         )
 
 # Command: Query PDF document
 @app.command(name="query")
 def query(
-    query: str = typer.Argument(..., help="Query to search for in the documents")
+    query: str = typer.Argument(..., help="Query to search for in the documents"),
+    no_cache: bool = typer.Option(
+        False, "--no-cache", help="Bypass cached answers and re-run the query."
+    ),
 ) -> None:
     """Ask questions to embedded PDF document"""
     ragdocer = get_ragdocs()
-    results = ragdocer.query_documents(query)
-    if not results:
-        typer.secho(
-            'No matching documents found', fg=typer.colors.RED
+    # Stream the answer: tokens render while the LLM is still
+    # generating instead of blocking until the full response is ready
+    stream = ragdocer.stream_query(query, use_cache=not no_cache)
+    first = next(stream, None)
+    if first is None:
+        _secho(
+            'No matching documents found', fg=_RED
         )
         raise typer.Exit()
-    typer.secho(
-        results, fg=typer.colors.BRIGHT_WHITE
-    )
+    for chunk in chain((first,), stream):
+        _secho(chunk, fg=_BRIGHT_WHITE, nl=False)
+    typer.echo("")
+
+# Command: Interactive shell
+@app.command()
+def shell() -> None:
+    """Run ragctl commands interactively in a single process"""
+    import shlex
+    try:
+        # Line editing and history for the prompt
+        import readline  # noqa: F401
+    except ImportError:
+        pass
+    # Warm the model-controller once up front; get_ragdocs is memoized
+    # (chunk2-4), so every command below reuses the same instance and
+    # its caches instead of paying the import/startup cost per command
+    get_ragdocs()
+    _secho('ragctl shell — type "help" for commands, "exit" to leave', fg=_GREEN)
+    while True:
+        try:
+            line = input("ragctl> ")
+        except (EOFError, KeyboardInterrupt):
+            typer.echo("")
+            break
+        try:
+            tokens = shlex.split(line)
+        except ValueError as error:
+            _secho(f"ragctl: {error}", fg=_RED)
+            continue
+        if not tokens:
+            continue
+        cmd, *args = tokens
+        try:
+            if cmd in ("exit", "quit"):
+                break
+            elif cmd == "help":
+                typer.echo(
+                    "Commands: upload <path>..., embedding <id>..., list,\n"
+                    "          list-embedded, list-non-embedded, delete <id>,\n"
+                    "          query [--no-cache] <text>, exit"
+                )
+            elif cmd == "upload" and args:
+                upload(args)
+            elif cmd == "embedding" and args:
+                embed([int(arg) for arg in args])
+            elif cmd == "list":
+                list_all()
+            elif cmd == "list-non-embedded":
+                list_non_embedded()
+            elif cmd == "list-embedded":
+                list_embedded()
+            elif cmd == "delete" and len(args) == 1:
+                remove(int(args[0]))
+            elif cmd == "query" and args:
+                no_cache = "--no-cache" in args
+                text = " ".join(arg for arg in args if arg != "--no-cache")
+                query(text, no_cache=no_cache)
+            else:
+                _secho(f'ragctl: unknown command "{line}"', fg=_RED)
+        except typer.Exit:
+            # Commands raise Exit for their status; the shell keeps going
+            pass
+        except ValueError:
+            _secho("ragctl: document ids must be integers", fg=_RED)
 
 def _version_callback(value: bool) -> None:
     if value:
